@@ -7,19 +7,6 @@
 import asyncio
 import importlib
 import sys
-import subprocess
-
-# --- Auto-install Playwright ---
-def install_playwright():
-    try:
-        import playwright
-    except ImportError:
-        print("Playwright not found. Installing...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
-    try:
-        subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
-    except:
-        pass
 
 # --- Scraper List ---
 SCRAPERS = [
@@ -46,22 +33,29 @@ async def run_scraper(scraper):
     except Exception as e:
         print(f"\nERROR in {scraper['name']}: {e}\n")
 
-async def run_all():
+async def run_all(sequential: bool = False):
     print("\nRUNNING ALL SCRAPERS...\n")
-    for s in SCRAPERS:
-        await run_scraper(s)
+    if sequential:
+        for s in SCRAPERS:
+            await run_scraper(s)
+    else:
+        # run_scraper already catches and prints its own errors
+        await asyncio.gather(*(run_scraper(s) for s in SCRAPERS))
     print("ALL DONE.")
 
 def show_menu():
     print("\n" + " VEHICLE SCRAPERS ".center(60, "="))
     for i, s in enumerate(SCRAPERS, 1):
         print(f"{i}. {s['name']: <15} → {s['desc']}")
-    print("a. Run ALL")
+    print("a. Run ALL (parallel)")
+    print("s. Run ALL (one at a time)")
     print("0. Exit")
     print("=""="*60)
     return input("\nChoose: ").strip().lower()
 
 async def main():
+    # Imported here: must run before anything pulls in playwright
+    from utils.playwright_setup import install_playwright
     install_playwright()
 
     if len(sys.argv) > 1:
@@ -72,17 +66,25 @@ async def main():
     if choice in ["0", "exit", "q"]:
         print("Goodbye!")
         return
-    if choice in ["a", "all"]:
-        await run_all()
-    else:
-        try:
-            idx = int(choice) - 1
-            if 0 <= idx < len(SCRAPERS):
-                await run_scraper(SCRAPERS[idx])
-            else:
-                print("Invalid choice.")
-        except ValueError:
-            print("Enter number or 'a'")
+    try:
+        if choice in ["a", "all"]:
+            await run_all()
+        elif choice in ["s", "seq"]:
+            await run_all(sequential=True)
+        else:
+            try:
+                idx = int(choice) - 1
+                if 0 <= idx < len(SCRAPERS):
+                    await run_scraper(SCRAPERS[idx])
+                else:
+                    print("Invalid choice.")
+            except ValueError:
+                print("Enter number, 'a' or 's'")
+    finally:
+        # Shut down the shared browser only if a scraper actually started it
+        pool = sys.modules.get("utils.browser_pool")
+        if pool:
+            await pool.close_browser()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
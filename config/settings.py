@@ -6,12 +6,21 @@
 # ======================================================================
 
 from datetime import time
+from pathlib import Path
 
 # --------------------- BROWSER & STEALTH ---------------------
 BROWSER_FALLBACK = ['chromium', 'firefox']  # Try chromium first, then firefox
 HEADLESS = True                             # True = no window (production), False = debug
 SCROLL_WAIT_TIME = 2.5                      # Seconds between scrolls (lazy load)
 TIMEOUT = 90000                             # Page load timeout in ms (90 sec)
+BROWSER_POOL_RECYCLE_AFTER = 100            # Relaunch pooled browser after N contexts
+MAX_PARALLEL_CONTEXTS = 6                   # Max browser contexts open at once (all scrapers)
+# Holds the Playwright version browsers were installed for → reinstall on upgrade
+PLAYWRIGHT_SENTINEL = Path.home() / ".cache" / "vehicle_scraper" / ".pw_installed"
+
+# Resource types aborted before download (only DOM text is scraped).
+# Add "script" only for pages that render their listings without JS.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
 
 # Cloudflare / anti-bot detection
 CLOUDFLARE_TITLE = 'Cloudflare'
@@ -26,10 +35,15 @@ TIMEZONE = "Asia/Tehran"
 
 # --------------------- SITE URLs ---------------------
 BAMA_URL = "https://bama.ir/car"
+BAMA_PAGES = 20              # Listing pages fetched per run (?page=1..N)
+BAMA_PAGE_CONCURRENCY = 8    # Pages loaded in parallel inside one context
+BAMA_PAGE_TIMEOUT = 15000    # ms to wait for ad cards on a listing page (past-the-end pages have none)
 
 # --------------------- CSV SETTINGS ---------------------
 CSV_ENCODING = 'utf-8-sig'  # Excel-friendly for Persian text
 BACKUP_ENABLED = True
+DEDUPE_ACROSS_RUNS = False  # True = skip rows already saved by earlier runs (only new ads)
+DEDUPE_WINDOW_DAYS = 7      # Cross-run memory: forget rows not seen for this many days
 
 # Iran Proxy
 IRAN_PROXY = None  # Set to "http://IP:PORT"
@@ -2,12 +2,19 @@
 import asyncio
 from scrapers.bama_scraper import scrape as scrape_bama
 from scrapers.divar_scraper import scrape as scrape_divar  # ← ADDED
+from utils.browser_pool import close_browser
 
 async def main():
     print("Starting full scrape run...")
-    await scrape_bama()
-    await scrape_divar()
+    # Both scrapers are I/O-bound → run them side by side
+    try:
+        results = await asyncio.gather(scrape_bama(), scrape_divar(), return_exceptions=True)
+    finally:
+        await close_browser()
+    for name, result in zip(["Bama.ir", "Divar.ir"], results):
+        if isinstance(result, Exception):
+            print(f"ERROR in {name}: {result}")
     print("All scrapers completed.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -3,20 +3,24 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
 import asyncio
+import signal
 
 from config.settings import DAILY_RUN_HOUR, DAILY_RUN_MINUTE, TIMEZONE
 from scrapers.bama_scraper import scrape as scrape_bama
 from scrapers.divar_scraper import scrape as scrape_divar  # ← ADDED
+from utils.browser_pool import close_browser
 
 async def daily_job():
     print(f"\n{'='*60}")
     print(f" DAILY SCRAPE STARTED: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ")
     print(f"{'='*60}\n")
-    await scrape_bama()
-    await scrape_divar()  # ← ADDED
+    results = await asyncio.gather(scrape_bama(), scrape_divar(), return_exceptions=True)
+    for name, result in zip(["Bama.ir", "Divar.ir"], results):
+        if isinstance(result, Exception):
+            print(f"ERROR in {name}: {result}")
     print(f"\nDAILY SCRAPE FINISHED: {datetime.now().strftime('%H:%M:%S')}\n")
 
-def main():
+async def main_async():
     scheduler = AsyncIOScheduler()
     scheduler.add_job(
         daily_job,
@@ -27,12 +31,25 @@ def main():
         next_run += timedelta(days=1)
 
     print(f"Scheduler started. Next run: {next_run.strftime('%Y-%m-%d %H:%M')} ({TIMEZONE})")
-    scheduler.start()
-    try:
-        asyncio.get_event_loop().run_forever()
-    except KeyboardInterrupt:
-        scheduler.shutdown()
-        print("Scheduler stopped.")
+    scheduler.start()  # attaches to the running loop
+
+    # Block until Ctrl+C / SIGTERM, then shut down cleanly
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: no loop signal handlers → plain handler that wakes the loop
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+    await stop.wait()
+
+    scheduler.shutdown()
+    await close_browser()
+    print("Scheduler stopped.")
+
+def main():
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
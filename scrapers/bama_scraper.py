@@ -3,7 +3,7 @@
 # BAMA.IR SCRAPER — FULLY DOCUMENTED & PRODUCTION READY
 # Scrapes: https://bama.ir/car
 # Features:
-#   • Lazy loading via infinite scroll
+#   • Paginated listing pages (?page=N) fetched in parallel
 #   • Extracts: model, year, mileage, description, price (or negotiable)
 #   • Only includes ads with price or negotiable tag
 #   • Saves to daily CSV: bama_2025-11-10.csv
@@ -14,23 +14,25 @@
 # ======================================================================
 
 import asyncio
+import json
 import time
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from playwright.async_api import (
-    Page, 
-    TimeoutError as PWTimeout,
-    async_playwright  # ← ADD THIS LINE
+    Page,
+    BrowserContext,
+    TimeoutError as PWTimeout
 )
 
 # --- Shared utils ---
 from utils.helpers import (
     setup_logging, save_to_csv, get_current_date_str,
-    launch_browser_with_fallback, retry
+    launch_browser_with_fallback, retry, CONTEXT_SEM
 )
-from config.settings import TIMEOUT, SCROLL_WAIT_TIME, BAMA_URL
+from utils.browser_pool import close_browser
+from config.settings import TIMEOUT, BAMA_URL, BAMA_PAGES, BAMA_PAGE_CONCURRENCY, BAMA_PAGE_TIMEOUT
 
 # --- Selectors ---
 AD_CARD_SELECTOR = '.bama-ad-holder'
@@ -41,6 +43,42 @@ DESC_SELECTOR = '.bama-ad__detail-trim'
 PRICE_SELECTOR = '.bama-ad__price'
 NEGOTIABLE_SELECTOR = '.bama-ad__negotiable-price'
 
+# Unicode-aware: keeps Persian digits (۰-۹) as well as ASCII 0-9
+_NON_DIGIT = re.compile(r"\D+")
+
+SELECTORS = {
+    "card": AD_CARD_SELECTOR,
+    "link": AD_LINK_SELECTOR,
+    "year": YEAR_SELECTOR,
+    "mileage": MILEAGE_SELECTOR,
+    "desc": DESC_SELECTOR,
+    "price": PRICE_SELECTOR,
+    "negotiable": NEGOTIABLE_SELECTOR,
+}
+
+# One in-page scan over all cards → a single CDP round-trip per page
+EXTRACT_CARDS_JS = '''(sel) => {
+    const text = (el) => el ? el.innerText.trim() : '';
+    return Array.from(document.querySelectorAll(sel.card)).map(card => {
+        const link = card.querySelector(sel.link);
+        if (!link) return null;
+        const price = card.querySelector(sel.price);
+        const neg = card.querySelector(sel.negotiable);
+        return {
+            model: (link.getAttribute('title') || '').trim(),
+            url: link.getAttribute('href'),
+            year: text(card.querySelector(sel.year)),
+            mileage: Array.from(card.querySelectorAll(sel.mileage)).map(e => e.innerText).join(' ').trim(),
+            desc: text(card.querySelector(sel.desc)),
+            price_raw: price ? price.innerText : null,
+            neg_raw: neg ? neg.innerText : null
+        };
+    }).filter(x => x);
+}'''
+
+# Registered once per context → each page calls it with a ~40 byte evaluate
+EXTRACT_CARDS_INIT = f"window.__extractCards = () => ({EXTRACT_CARDS_JS})({json.dumps(SELECTORS)});"
+
 # --- Output ---
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -49,35 +87,54 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 logger = setup_logging()
 
 # =====================================================
-# HELPER: Scroll to load all lazy content
+# HELPER: Wait for cards on a loaded page and extract them
+# =====================================================
+async def extract_cards(page: Page, page_num: int) -> List[Dict]:
+    # Raises PWTimeout if no ad card shows up within BAMA_PAGE_TIMEOUT
+    await page.wait_for_selector(AD_CARD_SELECTOR, timeout=BAMA_PAGE_TIMEOUT)
+    raw_cards = await page.evaluate("() => window.__extractCards()")
+    logger.info(f"Page {page_num}: {len(raw_cards)} ad cards")
+    return raw_cards
+
+# =====================================================
+# HELPER: Load one listing page and extract its cards
+# =====================================================
+async def fetch_page(context: BrowserContext, page_num: int) -> Optional[List[Dict]]:
+    # [] = page loaded but has no cards (past the end); None = page failed to load
+    page = await context.new_page()
+    try:
+        await page.goto(f"{BAMA_URL}?page={page_num}", wait_until="domcontentloaded", timeout=TIMEOUT)
+        try:
+            return await extract_cards(page, page_num)
+        except PWTimeout:
+            logger.info(f"Page {page_num}: no ad cards")
+            return []
+    except Exception as e:
+        logger.error(f"Page {page_num} failed: {e}")
+        return None
+    finally:
+        await page.close()
+
+# =====================================================
+# HELPER: Add a page's cards, return how many URLs were new
 # =====================================================
-async def scroll_and_load(page: Page):
-    prev_height = 0
-    stable_rounds = 0
-    max_rounds = 50
-
-    logger.info("Starting lazy loading scroll...")
-    for round_num in range(1, max_rounds + 1):
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await page.wait_for_timeout(int(SCROLL_WAIT_TIME * 1000))
-
-        cur_height = await page.evaluate("document.body.scrollHeight")
-        logger.info(f"Scroll {round_num}: Height = {cur_height}")
-
-        if cur_height == prev_height:
-            stable_rounds += 1
-            if stable_rounds >= 3:
-                logger.info("No new content for 3 rounds → scrolling complete")
-                break
-        else:
-            stable_rounds = 0
-        prev_height = cur_height
+def merge_cards(raw_cards: List[Dict], page_cards: List[Dict], seen_urls: set) -> int:
+    added = 0
+    for card in page_cards:
+        url = card["url"]
+        if url:
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+        raw_cards.append(card)
+        added += 1
+    return added
 
 # =====================================================
 # HELPER: Extract clean price
 # =====================================================
 def clean_price(text: str) -> str:
-    return "".join(filter(str.isdigit, text)) if text else ""
+    return _NON_DIGIT.sub("", text) if text else ""
 
 # =====================================================
 # MAIN SCRAPER (with retry)
@@ -88,78 +145,87 @@ async def scrape():
     all_data: List[Dict] = []
     today = get_current_date_str()
 
-    async with async_playwright() as p:  # ← THIS LINE USES async_playwright()
-        page, context = await launch_browser_with_fallback(p, BAMA_URL)
+    # Global cap on open contexts across all scrapers (bounds Chromium RSS)
+    async with CONTEXT_SEM:
+        page, context = await launch_browser_with_fallback(BAMA_URL, init_script=EXTRACT_CARDS_INIT)
         if not page:
             logger.error("Browser launch failed. Exiting.")
             return
 
         try:
-            logger.info(f"Navigating to {BAMA_URL}")
-            await page.goto(BAMA_URL, wait_until="networkidle", timeout=TIMEOUT)
-            await scroll_and_load(page)
-
-            logger.info("Extracting ad cards...")
-            cards = await page.query_selector_all(AD_CARD_SELECTOR)
-            logger.info(f"Found {len(cards)} ad cards")
-
-            for idx, card in enumerate(cards, 1):
-                try:
-                    link_elem = await card.query_selector(AD_LINK_SELECTOR)
-                    if not link_elem:
-                        continue
-                    model = (await link_elem.get_attribute("title") or "").strip()
-                    ad_url = await link_elem.get_attribute("href")
-                    if ad_url and not ad_url.startswith("http"):
-                        ad_url = "https://bama.ir" + ad_url
-
-                    year_elem = await card.query_selector(YEAR_SELECTOR)
-                    year = (await year_elem.inner_text()).strip() if year_elem else ""
-
-                    mileage_elems = await card.query_selector_all(MILEAGE_SELECTOR)
-                    mileage = " ".join([await e.inner_text() for e in mileage_elems]).strip()
-
-                    desc_elem = await card.query_selector(DESC_SELECTOR)
-                    description = (await desc_elem.inner_text()).strip() if desc_elem else ""
-
-                    price_elem = await card.query_selector(PRICE_SELECTOR)
-                    negotiable_elem = await card.query_selector(NEGOTIABLE_SELECTOR)
-
-                    price = ""
-                    price_status = ""
-
-                    if price_elem:
-                        price_raw = await price_elem.inner_text()
-                        price = clean_price(price_raw)
-                        price_status = "fixed"
-                    elif negotiable_elem:
-                        price_raw = await negotiable_elem.inner_text()
-                        price = clean_price(price_raw) or "توافقی"
-                        price_status = "negotiable"
-                    else:
-                        continue
+            # The launcher's page already loaded the listing and passed anti-bot
+            # checks → it is page 1. Errors propagate so @retry can start over.
+            first_page = await extract_cards(page, 1)
+            await page.close()
+        except Exception:
+            await context.close()
+            raise
 
-                    if model and (price or price_status == "negotiable"):
-                        all_data.append({
-                            "model": model,
-                            "year": year,
-                            "mileage": mileage,
-                            "description": description,
-                            "price": price,
-                            "price_status": price_status,
-                            "source_url": ad_url or "",
-                            "scrape_date": today
-                        })
-
-                    if idx % 50 == 0:
-                        logger.info(f"Processed {idx}/{len(cards)} ads")
-
-                except Exception as e:
-                    logger.error(f"Error on card {idx}: {e}")
+        try:
+            # Listings shift between pages while loading → dedupe by ad URL
+            raw_cards: List[Dict] = []
+            seen_urls = set()
+            merge_cards(raw_cards, first_page, seen_urls)
+
+            # Batches of BAMA_PAGE_CONCURRENCY pages; stop after the batch in which
+            # a page loaded fine but added no new ads (failed pages don't count)
+            page_num = 2
+            done = False
+            while page_num <= BAMA_PAGES and not done:
+                batch = list(range(page_num, min(page_num + BAMA_PAGE_CONCURRENCY, BAMA_PAGES + 1)))
+                pages = await asyncio.gather(*(fetch_page(context, n) for n in batch))
+
+                # One more try for pages that failed (timeout, crash, 5xx)
+                failed = [n for n, page_cards in zip(batch, pages) if page_cards is None]
+                if failed:
+                    retried = await asyncio.gather(*(fetch_page(context, n) for n in failed))
+                    results = dict(zip(batch, pages))
+                    results.update(zip(failed, retried))
+                    pages = [results[n] for n in batch]
+
+                for n, page_cards in zip(batch, pages):
+                    if page_cards is None:
+                        logger.warning(f"Page {n} failed twice — skipped")
+                        continue
+                    if merge_cards(raw_cards, page_cards, seen_urls) == 0 and not done:
+                        if n == 2:
+                            logger.warning("Page 2 added no new ads — site may be ignoring ?page=N")
+                        else:
+                            logger.info(f"Page {n} added no new ads → last page reached")
+                        done = True
+                page_num += len(batch)
+            logger.info(f"Found {len(raw_cards)} unique ad cards")
+
+            for card in raw_cards:
+                model = card["model"]
+                ad_url = card["url"]
+                if ad_url and not ad_url.startswith("http"):
+                    ad_url = "https://bama.ir" + ad_url
+
+                if card["price_raw"] is not None:
+                    price = clean_price(card["price_raw"])
+                    price_status = "fixed"
+                elif card["neg_raw"] is not None:
+                    price = clean_price(card["neg_raw"]) or "توافقی"
+                    price_status = "negotiable"
+                else:
                     continue
 
+                if model and (price or price_status == "negotiable"):
+                    all_data.append({
+                        "model": model,
+                        "year": card["year"],
+                        "mileage": card["mileage"],
+                        "description": card["desc"],
+                        "price": price,
+                        "price_status": price_status,
+                        "source_url": ad_url or "",
+                        "scrape_date": today
+                    })
+
             if all_data:
-                csv_path = save_to_csv(all_data, "bama")
+                # File I/O in a worker thread → the other scraper keeps running
+                csv_path = await asyncio.to_thread(save_to_csv, all_data, "bama")
                 logger.info(f"SCRAPING COMPLETE: {len(all_data)} vehicles saved")
             else:
                 logger.warning("NO DATA COLLECTED")
@@ -167,8 +233,9 @@ async def scrape():
         except Exception as e:
             logger.exception(f"CRITICAL ERROR: {e}")
         finally:
-            if context and context.browser:
-                await context.browser.close()
+            # Pooled browser stays warm; only this scrape's context goes away
+            if context:
+                await context.close()
 
     elapsed = time.time() - start_time
     print(f"\n{'='*70}")
@@ -178,5 +245,11 @@ async def scrape():
     print(f" Output         : output/bama_{today}.csv")
     print(f"{'='*70}\n")
 
+async def main():
+    try:
+        await scrape()
+    finally:
+        await close_browser()
+
 if __name__ == "__main__":
-    asyncio.run(scrape())  # ← THIS USES asyncio
\ No newline at end of file
+    asyncio.run(main())  # ← THIS USES asyncio
\ No newline at end of file
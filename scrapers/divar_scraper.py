@@ -3,13 +3,14 @@
 
 import asyncio
 import time
-import random
 from pathlib import Path
 from typing import List, Dict
 
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PWTimeout
 
-from utils.helpers import setup_logging, save_to_csv, get_current_date_str, retry
+from config.settings import SCROLL_WAIT_TIME
+from utils.helpers import setup_logging, save_to_csv, get_current_date_str, retry, block_resources, CONTEXT_SEM
+from utils.browser_pool import open_context, close_browser
 
 DIVAR_URL = "https://divar.ir/s/tehran/car"
 OUTPUT_DIR = Path("output")
@@ -17,9 +18,15 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 logger = setup_logging()
 
 MAIN_CARD = 'article[data-testid="post-card"]'
+COUNT_CARDS_JS = f"document.querySelectorAll('{MAIN_CARD}').length"
+SCROLL_AND_COUNT_JS = f"() => {{ window.scrollBy(0, 1400); return {COUNT_CARDS_JS}; }}"
 
-async def human_delay():
-    await asyncio.sleep(random.uniform(3.0, 6.0))
+async def wait_for_idle(page, timeout: int = 4000):
+    # Bounded: returns once XHRs settle, or after `timeout` ms on chatty pages
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+    except PWTimeout:
+        pass
 
 @retry(max_attempts=1, delay=0)
 async def scrape():
@@ -27,45 +34,47 @@ async def scrape():
     all_data = []
     today = get_current_date_str()
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=False,
-            args=[
-                "--no-sandbox",
-                "--disable-blink-features=AutomationControlled",
-                "--start-maximized"
-            ]
-        )
-        context = await browser.new_context(
-            viewport=None,
-            user_agent="Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
-            locale="fa-IR"
-        )
-        page = await context.new_page()
-
-        # MANUAL STEALTH
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', { get: () => false });
-            Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
-            window.chrome = { runtime: {} };
-            delete navigator.__proto__.webdriver;
-        """)
-
+    # Global cap on open contexts across all scrapers (bounds Chromium RSS)
+    async with CONTEXT_SEM:
+        context = None
         try:
+            context = await open_context(
+                viewport=None,
+                user_agent="Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+                locale="fa-IR"
+            )
+            # Cards are React-rendered → keep scripts/XHR, drop images/fonts/css
+            await block_resources(context)
+            page = await context.new_page()
+
+            # MANUAL STEALTH
+            await page.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', { get: () => false });
+                Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
+                window.chrome = { runtime: {} };
+                delete navigator.__proto__.webdriver;
+            """)
+
             logger.info("Opening Divar...")
-            await page.goto(DIVAR_URL, wait_until="networkidle", timeout=90000)
-            await human_delay()
+            await page.goto(DIVAR_URL, wait_until="domcontentloaded", timeout=90000)
 
-            # Wait for cards
+            # Wait for cards (not for ad/telemetry traffic to go quiet)
             await page.wait_for_selector(MAIN_CARD, timeout=30000)
+            await wait_for_idle(page)
             logger.info("Cards loaded")
 
             # Scroll to load ALL cars (15 times)
+            # Scroll + count in one call, then wait only until new cards render
+            # (capped at SCROLL_WAIT_TIME)
             for i in range(15):
-                await page.evaluate("window.scrollBy(0, 1400)")
-                await human_delay()
-                count = await page.evaluate("document.querySelectorAll('article[data-testid=\"post-card\"]').length")
+                count = await page.evaluate(SCROLL_AND_COUNT_JS)
                 logger.info(f"Scroll {i+1}: {count} cards")
+                try:
+                    await page.wait_for_function(
+                        f"{COUNT_CARDS_JS} > {count}", timeout=int(SCROLL_WAIT_TIME * 1000)
+                    )
+                except PWTimeout:
+                    pass
 
             # Extract ALL
             raw_data = await page.evaluate('''() => {
@@ -94,7 +103,7 @@ async def scrape():
                 })
 
             if all_data:
-                save_to_csv(all_data, "divar")
+                await asyncio.to_thread(save_to_csv, all_data, "divar")
                 logger.info(f"SAVED {len(all_data)} vehicles to output/divar_{today}.csv")
             else:
                 logger.warning("No data")
@@ -102,7 +111,8 @@ async def scrape():
         except Exception as e:
             logger.exception(f"ERROR: {e}")
         finally:
-            await browser.close()
+            if context:
+                await context.close()
 
     elapsed = time.time() - start_time
     print(f"\n{'='*70}")
@@ -112,5 +122,11 @@ async def scrape():
     print(f" Output         : output/divar_{today}.csv")
     print(f"{'='*70}\n")
 
+async def main():
+    try:
+        await scrape()
+    finally:
+        await close_browser()
+
 if __name__ == "__main__":
-    asyncio.run(scrape())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,104 @@
+# utils/browser_pool.py
+# ======================================================================
+# SHARED BROWSER POOL: one warm Playwright + browser per process
+# Scrapers ask the pool for a fresh BrowserContext and close only that
+# context when done → no Chromium cold start per run.
+# Features:
+#   • Lazy start on first use (guarded by asyncio.Lock)
+#   • One browser per type (chromium / firefox fallback)
+#   • Every open context is a lease; the browser is recycled after
+#     BROWSER_POOL_RECYCLE_AFTER contexts, but only with zero leases
+# ======================================================================
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from playwright.async_api import async_playwright, BrowserContext, Playwright
+
+from config.settings import HEADLESS, BROWSER_POOL_RECYCLE_AFTER
+
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-infobars",
+    "--disable-extensions",
+    "--start-maximized",
+    "--disable-web-security",
+    "--disable-features=IsolateOrigins,site-per-process"
+]
+
+_playwright: Optional[Playwright] = None
+# browser_type → {"browser": Browser, "leases": open contexts, "handed_out": total contexts}
+_pool: Dict[str, Dict] = {}
+_lock = asyncio.Lock()
+
+# ----------------------------------------------------------------------
+# OPEN A CONTEXT ON THE SHARED BROWSER
+# ----------------------------------------------------------------------
+async def open_context(browser_type: str = "chromium", **context_options) -> BrowserContext:
+    """
+    Returns a new BrowserContext on the pooled `browser_type` browser,
+    launching it on first use. The context holds a lease on the browser
+    until it is closed; a worn-out browser is only relaunched once no
+    leases are outstanding, so no caller ever gets its browser closed.
+    """
+    global _playwright
+    logger = logging.getLogger("scraper")
+
+    async with _lock:
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+
+        entry = _pool.get(browser_type)
+        if entry is not None:
+            stale = not entry["browser"].is_connected()
+            worn_out = entry["handed_out"] >= BROWSER_POOL_RECYCLE_AFTER and entry["leases"] == 0
+            if stale or worn_out:
+                logger.info(f"Recycling pooled {browser_type} browser")
+                try:
+                    await entry["browser"].close()
+                except Exception:
+                    pass
+                entry = None
+
+        if entry is None:
+            logger.info(f"Launching pooled {browser_type} browser...")
+            browser = await _playwright[browser_type].launch(headless=HEADLESS, args=BROWSER_ARGS)
+            entry = {"browser": browser, "leases": 0, "handed_out": 0}
+            _pool[browser_type] = entry
+
+        # Lease is taken under the lock → a concurrent caller can't recycle it away
+        entry["leases"] += 1
+        entry["handed_out"] += 1
+        try:
+            context = await entry["browser"].new_context(**context_options)
+        except Exception:
+            entry["leases"] -= 1
+            raise
+
+    def release(_):
+        entry["leases"] -= 1
+
+    context.on("close", release)
+    return context
+
+# ----------------------------------------------------------------------
+# SHUT DOWN ALL POOLED BROWSERS
+# ----------------------------------------------------------------------
+async def close_browser():
+    """
+    Closes every pooled browser and stops Playwright.
+    Call once at process exit (CLI, run_all, scheduler shutdown).
+    """
+    global _playwright
+    async with _lock:
+        for entry in _pool.values():
+            try:
+                await entry["browser"].close()
+            except Exception:
+                pass
+        _pool.clear()
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
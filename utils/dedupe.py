@@ -0,0 +1,54 @@
+# utils/dedupe.py
+# ======================================================================
+# ROW DEDUPLICATION: 64-bit fingerprints instead of full key tuples
+# Used by save_to_csv. Optional cross-run memory (DEDUPE_ACROSS_RUNS)
+# keeps fingerprints of rows saved in the last DEDUPE_WINDOW_DAYS days.
+# ======================================================================
+import hashlib
+import logging
+import pickle
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+DEDUPE_FIELDS = ("model", "year", "mileage", "price", "source_url")
+FINGERPRINT_DIR = Path("backups")
+
+# ----------------------------------------------------------------------
+# FINGERPRINT ONE ROW
+# ----------------------------------------------------------------------
+def fingerprint(row: Dict) -> int:
+    key = "|".join(str(row.get(field, "")) for field in DEDUPE_FIELDS)
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+# ----------------------------------------------------------------------
+# LOAD / SAVE FINGERPRINTS FROM EARLIER RUNS (one file per scraper)
+# Stored as {fingerprint: "YYYY-MM-DD" last seen} → rolling window
+# ----------------------------------------------------------------------
+def _fingerprint_path(prefix: str) -> Path:
+    return FINGERPRINT_DIR / f"{prefix}_fingerprints.pkl"
+
+def load_fingerprints(prefix: str, window_days: int) -> Dict[int, str]:
+    path = _fingerprint_path(prefix)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "rb") as f:
+            fingerprints = pickle.load(f)
+    except Exception as e:
+        logging.getLogger("scraper").warning(f"Could not read {path}: {e} — starting fresh")
+        return {}
+    if not isinstance(fingerprints, dict):
+        return {}
+
+    # Drop entries last seen before the window
+    cutoff = (datetime.now() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+    return {fp: seen_on for fp, seen_on in fingerprints.items() if seen_on >= cutoff}
+
+def save_fingerprints(prefix: str, fingerprints: Dict[int, str]):
+    FINGERPRINT_DIR.mkdir(exist_ok=True)
+    path = _fingerprint_path(prefix)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(fingerprints, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
@@ -4,54 +4,49 @@
 # Used by ALL scrapers. Manual stealth (no external libs).
 # Works on Python 3.11+ with Playwright.
 # Features:
-#   • Auto-install Playwright
+#   • Auto-install Playwright (re-exported from utils.playwright_setup)
 #   • Retry decorator
 #   • Full stealth
 # ======================================================================
 import asyncio
+import csv
 import os
 import logging
 import random
-import subprocess
-import sys
+import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-import pandas as pd
+from typing import List, Dict, Optional, Set, Tuple
 
-from playwright.async_api import async_playwright, Page, BrowserContext, TimeoutError as PWTimeout
+from playwright.async_api import Page, BrowserContext, TimeoutError as PWTimeout
 
 # --- Import config ---
 from config.settings import (
-    BROWSER_FALLBACK, HEADLESS, TIMEOUT, CLOUDFLARE_TITLE,
-    ANTI_BOT_PHRASES, SCROLL_WAIT_TIME
+    BROWSER_FALLBACK, TIMEOUT, CLOUDFLARE_TITLE,
+    ANTI_BOT_PHRASES, SCROLL_WAIT_TIME, BLOCKED_RESOURCE_TYPES, MAX_PARALLEL_CONTEXTS
 )
+from utils.browser_pool import open_context
+from utils.dedupe import fingerprint, load_fingerprints, save_fingerprints
+from utils.playwright_setup import install_playwright
 
-# ----------------------------------------------------------------------
-# AUTO-INSTALL PLAYWRIGHT
-# ----------------------------------------------------------------------
-def install_playwright():
-    """
-    Installs Playwright and Chromium if not present.
-    Called from cli_menu.py.
-    """
-    try:
-        import playwright
-    except ImportError:
-        print("Installing Playwright...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
-    try:
-        subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
-    except:
-        pass  # Already installed
+# Shared by all scrapers: hold it for the whole lifetime of a BrowserContext
+CONTEXT_SEM = asyncio.Semaphore(MAX_PARALLEL_CONTEXTS)
 
 # ----------------------------------------------------------------------
 # SETUP LOGGING (File + Console)
 # ----------------------------------------------------------------------
+_LOGGER: Optional[logging.Logger] = None
+
 def setup_logging(log_dir: str = "logs") -> logging.Logger:
+    # Every scraper calls this at import → configure once, reuse the logger
+    global _LOGGER
+    if _LOGGER:
+        return _LOGGER
+
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, "scraper.log")
 
+    # Root handlers → apscheduler/asyncio records land in scraper.log too
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
@@ -60,7 +55,8 @@ def setup_logging(log_dir: str = "logs") -> logging.Logger:
             logging.StreamHandler()
         ]
     )
-    return logging.getLogger("scraper")
+    _LOGGER = logging.getLogger("scraper")
+    return _LOGGER
 
 # ----------------------------------------------------------------------
 # SAVE TO CSV WITH DEDUPLICATION & UTF-8 BOM
@@ -70,26 +66,53 @@ def save_to_csv(data: List[Dict], prefix: str, output_dir: str = "output") -> Op
         logging.getLogger("scraper").warning("No data to save.")
         return None
 
-    df = pd.DataFrame(data)
-    df = df.drop_duplicates(subset=["model", "year", "mileage", "price", "source_url"]).sort_values("model")
     today = datetime.now().strftime("%Y-%m-%d")
     filename = f"{prefix}_{today}.csv"
     filepath = Path(output_dir) / filename
     os.makedirs(output_dir, exist_ok=True)
-    df.to_csv(filepath, index=False, encoding='utf-8-sig')
-    
-    logger = logging.getLogger("scraper")
-    logger.info(f"SAVED {len(df)} rows → {filepath}")
 
-    # --- Backup ---
+    # Dedupe on 64-bit row fingerprints ({fingerprint: last seen date})
+    from config.settings import DEDUPE_ACROSS_RUNS, DEDUPE_WINDOW_DAYS
+    seen = load_fingerprints(prefix, DEDUPE_WINDOW_DAYS) if DEDUPE_ACROSS_RUNS else {}
+    new_rows = []
+    for row in sorted(data, key=lambda r: r.get("model", "")):
+        fp = fingerprint(row)
+        if fp not in seen:
+            new_rows.append(row)
+        seen[fp] = today
+
+    logger = logging.getLogger("scraper")
+    if not new_rows:
+        # Never truncate an earlier run's file (or its backup) with a header-only CSV
+        if DEDUPE_ACROSS_RUNS:
+            save_fingerprints(prefix, seen)  # nothing to lose → just refresh last-seen dates
+        logger.info(f"No new rows for {prefix} — {filepath} left unchanged")
+        return filepath if filepath.exists() else None
+
+    # Same-day rerun with cross-run dedupe → append, so the earlier rows stay
+    append = DEDUPE_ACROSS_RUNS and filepath.exists()
+    with open(filepath, "a" if append else "w",
+              encoding="utf-8" if append else "utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(data[0].keys()))
+        if not append:
+            writer.writeheader()
+        writer.writerows(new_rows)
+
+    logger.info(f"{'APPENDED' if append else 'SAVED'} {len(new_rows)} rows → {filepath}")
+
+    # --- Backup (plain file copy, no second serialization) ---
     from config.settings import BACKUP_ENABLED
     if BACKUP_ENABLED:
         backup_dir = Path("backups")
         backup_dir.mkdir(exist_ok=True)
         backup_path = backup_dir / f"{prefix}_{today}_backup.csv"
-        df.to_csv(backup_path, index=False, encoding='utf-8-sig')
+        shutil.copyfile(filepath, backup_path)
         logger.info(f"BACKUP → {backup_path}")
 
+    # Only now mark rows as seen: a failed write above must not hide them from later runs
+    if DEDUPE_ACROSS_RUNS:
+        save_fingerprints(prefix, seen)
+
     return filepath
 
 # ----------------------------------------------------------------------
@@ -118,10 +141,26 @@ def retry(max_attempts: int = 3, delay: float = 2.0):
         return wrapper
     return decorator
 
+# ----------------------------------------------------------------------
+# BLOCK HEAVY RESOURCES (images, fonts, media, css)
+# ----------------------------------------------------------------------
+async def block_resources(context: BrowserContext, blocked_types: Set[str] = BLOCKED_RESOURCE_TYPES):
+    async def handle(route):
+        if route.request.resource_type in blocked_types:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+
 # ----------------------------------------------------------------------
 # MANUAL STEALTH BROWSER LAUNCH
 # ----------------------------------------------------------------------
-async def launch_browser_with_fallback(p, start_url: str) -> Tuple[Optional[Page], Optional[BrowserContext]]:
+async def launch_browser_with_fallback(
+    start_url: str,
+    blocked_types: Set[str] = BLOCKED_RESOURCE_TYPES,
+    init_script: Optional[str] = None
+) -> Tuple[Optional[Page], Optional[BrowserContext]]:
     logger = logging.getLogger("scraper")
     IRANIAN_UA = (
         "Mozilla/5.0 (Linux; Android 13; SM-G991B) "
@@ -129,27 +168,14 @@ async def launch_browser_with_fallback(p, start_url: str) -> Tuple[Optional[Page
     )
 
     for browser_type in BROWSER_FALLBACK:
-        browser = None
         context = None
         page = None
         try:
-            logger.info(f"Launching {browser_type} with stealth...")
-
-            browser = await p[browser_type].launch(
-                headless=HEADLESS,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-infobars",
-                    "--disable-extensions",
-                    "--start-maximized",
-                    "--disable-web-security",
-                    "--disable-features=IsolateOrigins,site-per-process"
-                ]
-            )
+            logger.info(f"Opening {browser_type} context with stealth...")
 
-            context = await browser.new_context(
+            # Shared, already-warm browser → only the context is per-scrape
+            context = await open_context(
+                browser_type,
                 viewport={"width": 390, "height": 844},
                 user_agent=IRANIAN_UA,
                 locale="fa-IR",
@@ -157,15 +183,20 @@ async def launch_browser_with_fallback(p, start_url: str) -> Tuple[Optional[Page
                 bypass_csp=True,
                 color_scheme="light"
             )
+            await block_resources(context, blocked_types)
 
-            page = await context.new_page()
-
-            await page.add_init_script("""
+            # Registered on the context → applies to every page opened in it
+            await context.add_init_script("""
                 Object.defineProperty(navigator, 'webdriver', { get: () => false });
                 Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
                 Object.defineProperty(navigator, 'languages', { get: () => ['fa-IR', 'fa', 'en'] });
                 window.chrome = { runtime: {}, loadTimes: () => {}, csi: () => {} };
             """)
+            # Scraper-specific helpers (e.g. window.__extractCards), sent once per context
+            if init_script:
+                await context.add_init_script(init_script)
+
+            page = await context.new_page()
 
             await page.wait_for_timeout(random.uniform(2000, 4000))
 
@@ -185,7 +216,6 @@ async def launch_browser_with_fallback(p, start_url: str) -> Tuple[Optional[Page
             logger.warning(f"{browser_type} failed: {e} — trying next...")
             if page: await page.close()
             if context: await context.close()
-            if browser: await browser.close()
 
     logger.error("ALL BROWSERS FAILED. Check internet, proxy, or site status.")
-    return None, None
\ No newline at end of file
+    return None, None
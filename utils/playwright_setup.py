@@ -0,0 +1,46 @@
+# utils/playwright_setup.py
+# ======================================================================
+# AUTO-INSTALL PLAYWRIGHT + CHROMIUM
+# Kept free of playwright imports so it works before Playwright exists.
+# Re-exported by utils.helpers; called lazily from cli_menu.py.
+# ======================================================================
+import importlib
+import importlib.metadata
+import subprocess
+import sys
+from typing import Optional
+
+from config.settings import PLAYWRIGHT_SENTINEL
+
+def _playwright_version() -> Optional[str]:
+    try:
+        return importlib.metadata.version("playwright")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+# ----------------------------------------------------------------------
+# AUTO-INSTALL PLAYWRIGHT
+# ----------------------------------------------------------------------
+def install_playwright():
+    """
+    Installs Playwright and Chromium if not present.
+    The sentinel records the Playwright version the browsers were installed
+    for; after `pip install -U playwright` it no longer matches and
+    `playwright install chromium` runs again for the new browser build.
+    """
+    version = _playwright_version()
+    if version and PLAYWRIGHT_SENTINEL.exists() and PLAYWRIGHT_SENTINEL.read_text().strip() == version:
+        return
+
+    if version is None:
+        print("Playwright not found. Installing...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
+        importlib.invalidate_caches()
+        version = _playwright_version()
+    try:
+        subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
+    except:
+        return
+    if version:
+        PLAYWRIGHT_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+        PLAYWRIGHT_SENTINEL.write_text(version)